@@ -7,3 +7,9 @@ class NameDuplicationError(exceptions.APIException):
     default_detail = {
         'ingredients': [{'ingredients': ['Дублируется ингредиент!']}]
     }
+
+
+class RequestBodyTooLarge(exceptions.APIException):
+    """Тело запроса больше допустимого размера."""
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Слишком большой запрос.'
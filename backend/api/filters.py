@@ -1,18 +1,30 @@
+from django.conf import settings
+from django.db.models import BooleanField, Case, Exists, OuterRef, Q, When
 from django_filters.rest_framework import FilterSet, filters
+from rest_framework.filters import OrderingFilter
 
-from recipes.models import Ingredient, Recipy, Tag
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipy,
+    RecipyTags,
+    ShoppingCart,
+    Tag
+)
 
 
 class RecipyFilter(FilterSet):
     """
     Фильтр настраивает поиск по тегу и по id автора,
     а также по параметрам is_favorited=1 и is_in_shopping_cart=1.
+    Связанные таблицы проверяются подзапросами EXISTS, без JOIN,
+    поэтому рецепты в выдаче не дублируются и DISTINCT не нужен.
     """
     tags = filters.ModelMultipleChoiceFilter(
         field_name='tags__slug',
         to_field_name='slug',
         queryset=Tag.objects.all(),
-        conjoined=False
+        method='get_tags'
     )
     is_in_shopping_cart = filters.NumberFilter(
         method='get_shopping_cart',
@@ -25,26 +37,74 @@ class RecipyFilter(FilterSet):
         model = Recipy
         fields = ('tags', 'author')
 
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(RecipyTags.objects.filter(
+            recipy=OuterRef('pk'), tag__in=value
+        )))
+
+    def filter_by_user(self, queryset, model, value):
+        if value != 1:
+            return queryset
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(Exists(model.objects.filter(
+            recipy=OuterRef('pk'), user=user
+        )))
+
     def get_shopping_cart(self, queryset, name, value):
-        if value == 1:
-            user = self.request.user
-            return queryset.filter(recipes_shoppingcarts__user=user)
-        return queryset
+        return self.filter_by_user(queryset, ShoppingCart, value)
 
     def get_favorited(self, queryset, name, value):
-        if value == 1:
-            user = self.request.user
-            return queryset.filter(recipes_favorites__user=user)
-        return queryset
+        return self.filter_by_user(queryset, Favorite, value)
 
 
 class IngredientFilter(FilterSet):
-    """Фильтр настраивает поиск по началу названия ингредиента."""
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='istartswith'
-    )
+    """
+    Фильтр настраивает поиск по названию ингредиента:
+    сначала совпадения с началом названия, затем по вхождению.
+    """
+    name = filters.CharFilter(method='get_name')
 
     class Meta:
         model = Ingredient
         fields = ('name',)
+
+    def get_name(self, queryset, name, value):
+        limit = settings.INGREDIENT_SEARCH_LIMIT
+        prefix = queryset.filter(
+            name__istartswith=value
+        ).order_by('name').values('pk')[:limit]
+        substring = queryset.filter(
+            name__icontains=value
+        ).exclude(
+            name__istartswith=value
+        ).order_by().values('pk')[:limit]
+        return queryset.filter(
+            Q(pk__in=prefix) | Q(pk__in=substring)
+        ).annotate(
+            is_prefix=Case(
+                When(name__istartswith=value, then=True),
+                default=False,
+                output_field=BooleanField()
+            )
+        ).order_by('-is_prefix', 'name')[:limit]
+
+
+class RecipyOrderingFilter(OrderingFilter):
+    """
+    Дополняет сортировку рецептов полем id в том же направлении:
+    так она совпадает с индексами по счётчикам, а рецепты с равными
+    значениями не перескакивают между страницами.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(
+            field.lstrip('-') in ('id', 'pk') for field in ordering
+        ):
+            direction = '-' if ordering[-1].startswith('-') else ''
+            return [*ordering, f'{direction}id']
+        return ordering
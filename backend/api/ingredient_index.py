@@ -0,0 +1,64 @@
+from bisect import bisect_left
+
+from core.cache import get_version
+from recipes.models import Ingredient
+
+
+def fold(value):
+    """Приводит название к виду для поиска: без регистра, ё как е."""
+    return value.casefold().replace('ё', 'е')
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для поиска по началу названия.
+    Хранит отсортированные свёрнутые названия и готовые к выдаче словари,
+    перестраивается при смене версии справочника ингредиентов.
+    """
+
+    def __init__(self):
+        self.data = (None, [], [])
+
+    def get_data(self):
+        version = get_version(Ingredient)
+        if version != self.data[0]:
+            rows = sorted(
+                (
+                    (fold(ingredient['name']), ingredient)
+                    for ingredient in Ingredient.objects.values(
+                        'id', 'name', 'measurement_unit'
+                    ).order_by()
+                ),
+                key=lambda row: row[0]
+            )
+            self.data = (
+                version,
+                [key for key, _ in rows],
+                [ingredient for _, ingredient in rows]
+            )
+        return self.data
+
+    def search(self, value, limit):
+        """
+        Возвращает до limit ингредиентов: сначала название начинается
+        с value, затем содержит value.
+        """
+        _, keys, items = self.get_data()
+        value = fold(value)
+        result = []
+        position = bisect_left(keys, value)
+        while (
+            position < len(keys) and len(result) < limit
+            and keys[position].startswith(value)
+        ):
+            result.append(items[position])
+            position += 1
+        for key, item in zip(keys, items):
+            if len(result) >= limit:
+                break
+            if value in key and not key.startswith(value):
+                result.append(item)
+        return result
+
+
+ingredient_index = IngredientIndex()
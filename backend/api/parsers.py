@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework.parsers import JSONParser, MultiPartParser
+
+from .exceptions import RequestBodyTooLarge
+
+
+class LimitedBodyMixin:
+    """
+    Отклоняет запрос по заголовку Content-Length до чтения тела.
+    К размеру изображения добавляется лимит Django на остальные поля.
+    """
+    image_ratio = 1
+
+    def get_max_length(self):
+        return (
+            settings.RECIPE_IMAGE_MAX_SIZE * self.image_ratio
+            + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        )
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > self.get_max_length():
+            raise RequestBodyTooLarge()
+        return super().parse(stream, media_type, parser_context)
+
+
+class RecipyJSONParser(LimitedBodyMixin, JSONParser):
+    """JSON с изображением в base64, которое на треть длиннее файла."""
+    image_ratio = 4 / 3
+
+
+class RecipyMultiPartParser(LimitedBodyMixin, MultiPartParser):
+    """
+    multipart/form-data, изображение пишется частями во временный файл
+    и не держится в памяти процесса целиком.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        request.upload_handlers = [
+            TemporaryFileUploadHandler(request)
+        ]
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,32 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """
+    Базовый рендерер для форматов списка покупок.
+    Файлы вьюсет отдаёт сам, через рендерер проходят только ошибки.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return JSONRenderer().render(data)
+
+
+class PDFRenderer(ShoppingListRenderer):
+    """Формат pdf, используется по умолчанию."""
+    media_type = 'application/pdf'
+    format = 'pdf'
+
+
+class CSVRenderer(ShoppingListRenderer):
+    """Формат csv."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class PlainTextRenderer(ShoppingListRenderer):
+    """Формат обычного текста."""
+    media_type = 'text/plain'
+    format = 'txt'
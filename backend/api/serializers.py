@@ -1,8 +1,8 @@
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.validators import (
     UniqueTogetherValidator,
-    UniqueValidator,
     ValidationError
 )
 
@@ -10,7 +10,7 @@ from core.constants import (
     CHARS_FOR_RECIPY_NAME,
     MIN_COOKING_TIME
 )
-from core.serializer_recipy import Base64ImageField
+from core.serializer_recipy import Base64ImageField, ThumbnailImageField
 from recipes.models import (
     Dosage,
     Favorite,
@@ -58,7 +58,7 @@ class RecipyGetSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения рецепта."""
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
-    image = Base64ImageField(read_only=True)
+    image = ThumbnailImageField(size='detail')
     tags = TagSerializer(read_only=True, many=True)
     ingredients = DosageSerializer(
         read_only=True,
@@ -83,6 +83,8 @@ class RecipyGetSerializer(serializers.ModelSerializer):
         model = Recipy
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request is None:
             return False
@@ -91,6 +93,8 @@ class RecipyGetSerializer(serializers.ModelSerializer):
         ).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         request = self.context.get('request')
         if request is None:
             return False
@@ -118,6 +122,8 @@ class DosageCreateSerializer(serializers.ModelSerializer):
 
 def dosagecreation(dosagelist, recipy):
     """Создает ингредиент с дозировкой в рецепте."""
+    if not dosagelist:
+        return
     bulk_list = []
     for ingredient in dosagelist:
         dosage = Dosage(
@@ -129,15 +135,59 @@ def dosagecreation(dosagelist, recipy):
     Dosage.objects.bulk_create(bulk_list)
 
 
+def update_tags(recipy, tags):
+    """Добавляет и удаляет только изменившиеся теги рецепта."""
+    current = set(RecipyTags.objects.filter(
+        recipy=recipy
+    ).values_list('tag_id', flat=True))
+    submitted = {tag.id for tag in tags}
+    if current - submitted:
+        RecipyTags.objects.filter(
+            recipy=recipy, tag_id__in=current - submitted
+        ).delete()
+    if submitted - current:
+        RecipyTags.objects.bulk_create(
+            [RecipyTags(tag_id=tag_id, recipy=recipy)
+             for tag_id in submitted - current]
+        )
+
+
+def update_dosages(dosagelist, recipy):
+    """
+    Сравнивает текущие и новые ингредиенты рецепта: удаляет лишние,
+    меняет изменившиеся количества и создаёт недостающие.
+    """
+    amounts = {
+        ingredient['id']: ingredient['amount'] for ingredient in dosagelist
+    }
+    current = {}
+    removed = []
+    changed = []
+    for dosage in Dosage.objects.filter(recipy=recipy).order_by():
+        if dosage.ingredient_id not in amounts or (
+            dosage.ingredient_id in current
+        ):
+            removed.append(dosage.id)
+            continue
+        current[dosage.ingredient_id] = dosage
+        if dosage.amount != amounts[dosage.ingredient_id]:
+            dosage.amount = amounts[dosage.ingredient_id]
+            changed.append(dosage)
+    if removed:
+        Dosage.objects.filter(id__in=removed).delete()
+    if changed:
+        Dosage.objects.bulk_update(changed, ['amount'])
+    dosagecreation(
+        [ingredient for ingredient in dosagelist
+         if ingredient['id'] not in current],
+        recipy
+    )
+
+
 class RecipySerializer(serializers.ModelSerializer):
     """Сериализатор для создания и редактирования рецепта."""
     image = Base64ImageField(required=True, allow_null=False)
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True,
-        read_only=False,
-        queryset=Tag.objects.all(),
-        validators=[UniqueValidator(queryset=RecipyTags.objects.all())]
-    )
+    tags = serializers.ListField(child=serializers.IntegerField())
     ingredients = DosageCreateSerializer(
         many=True,
         source='recipyingredient'
@@ -165,14 +215,16 @@ class RecipySerializer(serializers.ModelSerializer):
         return value
 
     def validate_tags(self, value):
-        tag_list = []
-        for tag in value:
-            if tag.slug in tag_list:
-                raise ValidationError('Такой тег уже есть!')
-            tag_list.append(tag.slug)
+        """Проверяет все теги одним запросом и возвращает их объекты."""
         if not value:
             raise ValidationError('Нужен хотя бы один тег!')
-        return value
+        if len(set(value)) != len(value):
+            raise ValidationError('Такой тег уже есть!')
+        tags = Tag.objects.in_bulk(value)
+        missing = [tag_id for tag_id in value if tag_id not in tags]
+        if missing:
+            raise ValidationError(f'Несуществующие теги: {missing}')
+        return [tags[tag_id] for tag_id in value]
 
     def validate_cooking_time(self, value):
         if int(value) < int(MIN_COOKING_TIME):
@@ -181,13 +233,21 @@ class RecipySerializer(serializers.ModelSerializer):
         return value
 
     def validate_ingredients(self, value):
-        ingredient_list = []
-        for ingredient in value:
-            if ingredient['id'] in ingredient_list:
-                raise NameDuplicationError()
-            ingredient_list.append(ingredient['id'])
+        """Проверяет ингредиенты до записи в базу одним запросом."""
         if not value:
             raise ValidationError('Нужен хотя бы один ингредиент!')
+        ingredient_ids = [ingredient['id'] for ingredient in value]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise NameDuplicationError()
+        existing = set(Ingredient.objects.filter(
+            id__in=ingredient_ids
+        ).values_list('id', flat=True))
+        missing = [
+            ingredient_id for ingredient_id in ingredient_ids
+            if ingredient_id not in existing
+        ]
+        if missing:
+            raise ValidationError(f'Несуществующие ингредиенты: {missing}')
         return value
 
     @transaction.atomic
@@ -207,14 +267,19 @@ class RecipySerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags')
         recipyingredients = validated_data.pop('recipyingredient')
         instance = super().update(instance, validated_data)
-        instance.tags.clear()
-        instance.tags.set(tags)
-        instance.ingredients.clear()
-        dosagecreation(recipyingredients, instance)
-        instance.save()
+        update_tags(instance, tags)
+        update_dosages(recipyingredients, instance)
         return instance
 
     def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance],
+            'tags',
+            Prefetch(
+                'recipyingredient',
+                Dosage.objects.select_related('ingredient')
+            )
+        )
         request = self.context.get('request')
         context = {'request': request}
         return RecipyGetSerializer(
@@ -1,54 +1,168 @@
+import csv
+import hashlib
 import io
+from functools import lru_cache
 
-from django.db.models import Sum
-from django.shortcuts import get_object_or_404
-from recipes.models import Dosage, Ingredient
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Sum
+from recipes.models import Dosage
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
+from reportlab.lib.utils import simpleSplit
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
-pdfmetrics.registerFont(TTFont('Arial', 'arial.ttf'))
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = inch
+AMOUNT_WIDTH = 1.5 * inch
+FONT_SIZE = 14
+LEADING = 18
+FONT_NAME = 'Arial'
+TITLE = 'Необходимо купить:'
+FOOTER = (
+    'Спасибо, что воспользовались приложением от Вики',
+    'https://github.com/Aenika',
+)
 
 
-def create_content(user):
+def get_shopping_list(user):
+    """
+    Суммирует дозировки ингредиентов из рецептов в списке покупок.
+    Название и единицы измерения берутся в том же запросе, что и сумма.
+    """
+    return list(Dosage.objects.filter(
+        recipy__recipes_shoppingcarts__user=user
+    ).values(
+        name=F('ingredient__name'),
+        measurement_unit=F('ingredient__measurement_unit')
+    ).annotate(
+        total=Sum('amount')
+    ).order_by('name'))
+
+
+def create_content(ingredients):
     """
     Создает список покупок
     в формате: ингредиент — дозировка.
     """
-    ingredients = Dosage.objects.filter(
-        recipy__recipes_shoppingcarts__user=user
-    ).values('ingredient').annotate(sum_amount=Sum('amount'))
     content = []
-    content.append('Необходимо купить:')
-    for i in ingredients:
-        ingredient = get_object_or_404(Ingredient, id=i['ingredient'])
-        amount = i['sum_amount']
+    content.append(TITLE)
+    for ingredient in ingredients:
         line = (
-            f'- {ingredient.name}'
-            f' ({ingredient.measurement_unit})'
-            f' — {amount};'
+            f'- {ingredient["name"]}'
+            f' ({ingredient["measurement_unit"]})'
+            f' — {ingredient["total"]};'
         )
         content.append(line)
     return content
 
 
-def create_downloadable_file(content):
-    """Создаёт скачиваемый файл."""
+@lru_cache(maxsize=None)
+def register_font():
+    """
+    Регистрирует шрифт при первом создании pdf файла.
+    Повторные вызовы в том же процессе ничего не делают.
+    """
+    pdfmetrics.registerFont(TTFont(FONT_NAME, settings.PDF_FONT_PATH))
+
+
+def start_page(p):
+    """Начинает страницу pdf файла и возвращает высоту первой строки."""
+    p.setFont(FONT_NAME, FONT_SIZE)
+    p.setFillGray(0.4)
+    p.drawRightString(
+        PAGE_WIDTH - MARGIN, MARGIN / 2, f'стр. {p.getPageNumber()}'
+    )
+    p.setFillGray(0)
+    return PAGE_HEIGHT - MARGIN
+
+
+def create_downloadable_file(ingredients):
+    """
+    Создаёт скачиваемый файл.
+    Название ингредиента переносится внутри левой колонки,
+    количество выравнивается по правому краю,
+    при нехватке места список продолжается на новой странице.
+    """
+    register_font()
     buffer = io.BytesIO()
-    p = canvas.Canvas(buffer)
-    textobject = p.beginText()
-    textobject.setTextOrigin(inch, 10 * inch)
-    textobject.setFont("Arial", 14)
-    for line in content:
-        textobject.textLine(line)
-    textobject.setFillGray(0.4)
-    textobject.textLines('''
-    Спасибо, что воспользовались приложением от Вики
-    https://github.com/Aenika
-    ''')
-    p.drawText(textobject)
-    p.showPage
+    p = canvas.Canvas(buffer, pagesize=A4)
+    name_width = PAGE_WIDTH - 2 * MARGIN - AMOUNT_WIDTH
+    y = start_page(p)
+    p.drawString(MARGIN, y, TITLE)
+    y -= 2 * LEADING
+    for ingredient in ingredients:
+        lines = simpleSplit(
+            f'{ingredient["name"]} ({ingredient["measurement_unit"]})',
+            FONT_NAME, FONT_SIZE, name_width
+        )
+        if y - len(lines) * LEADING < MARGIN:
+            p.showPage()
+            y = start_page(p)
+        p.drawRightString(PAGE_WIDTH - MARGIN, y, str(ingredient['total']))
+        for line in lines:
+            p.drawString(MARGIN, y, line)
+            y -= LEADING
+    if y - (len(FOOTER) + 1) * LEADING < MARGIN:
+        p.showPage()
+        y = start_page(p)
+    y -= LEADING
+    p.setFillGray(0.4)
+    for line in FOOTER:
+        p.drawString(MARGIN, y, line)
+        y -= LEADING
+    p.showPage()
     p.save()
     buffer.seek(0)
     return buffer
+
+
+class Echo:
+    """Буфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(ingredients):
+    """Построчно отдаёт список покупок в формате csv."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'total'))
+    for ingredient in ingredients:
+        yield writer.writerow((
+            ingredient['name'],
+            ingredient['measurement_unit'],
+            ingredient['total']
+        ))
+
+
+def stream_text(content):
+    """Построчно отдаёт список покупок обычным текстом."""
+    for line in content:
+        yield f'{line}\n'
+
+
+def get_content_version(content):
+    """
+    Возвращает хэш содержимого списка покупок.
+    Используется как ETag и ключ кэша готового pdf файла.
+    """
+    return hashlib.md5('\n'.join(content).encode()).hexdigest()
+
+
+def get_downloadable_file(ingredients, version):
+    """
+    Отдаёт pdf файл из кэша, а при его отсутствии создаёт и кэширует.
+    Одинаковые списки покупок используют один и тот же файл.
+    Файлы больше SHOPPING_CART_CACHE_MAX_FILE_SIZE не кэшируются.
+    """
+    cache = caches['shopping_cart']
+    key = f'shopping_cart_{version}'
+    pdf = cache.get(key)
+    if pdf is None:
+        pdf = create_downloadable_file(ingredients).getvalue()
+        if len(pdf) <= settings.SHOPPING_CART_CACHE_MAX_FILE_SIZE:
+            cache.set(key, pdf)
+    return io.BytesIO(pdf)
@@ -0,0 +1,189 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Dosage,
+    Favorite,
+    Ingredient,
+    Recipy,
+    RecipyTags,
+    ShoppingCart,
+    Tag
+)
+from users.models import Follow, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'versions'
+        },
+    }
+)
+class MediaTestCase(TestCase):
+    """Тесты с изображениями во временной папке media и кэшем в памяти."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @staticmethod
+    def create_image():
+        image = io.BytesIO()
+        Image.new('RGB', (40, 30), 'red').save(image, 'PNG')
+        return ContentFile(image.getvalue(), name='recipy.png')
+
+
+class RecipyListQueriesTest(MediaTestCase):
+    """
+    Количество запросов на страницу списка рецептов не зависит
+    от размера страницы: теги и ингредиенты подгружаются заранее,
+    флаги избранного, списка покупок и подписки берутся из аннотаций.
+    """
+    page_sizes = (3, 6, 12)
+    anonymous_queries = 4
+    authenticated_queries = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, author = (
+            User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='pass'
+            )
+            for name in ('user', 'author')
+        )
+        Follow.objects.create(user=cls.user, author=author)
+        tags = [
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag{number}',
+                               color=f'#00000{number}')
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(5)
+        ]
+        for number in range(max(cls.page_sizes)):
+            recipy = Recipy.objects.create(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Текст',
+                cooking_time=5,
+                image=cls.create_image()
+            )
+            RecipyTags.objects.bulk_create([
+                RecipyTags(recipy=recipy, tag=tag) for tag in tags[:2]
+            ])
+            Dosage.objects.bulk_create([
+                Dosage(recipy=recipy, ingredient=ingredient, amount=10)
+                for ingredient in ingredients[:3]
+            ])
+        Favorite.objects.create(user=cls.user, recipy=recipy)
+        ShoppingCart.objects.create(user=cls.user, recipy=recipy)
+
+    def assert_list_queries(self, client, expected):
+        # Первый запрос создаёт уменьшенные копии изображений.
+        client.get(f'/api/recipes/?limit={max(self.page_sizes)}')
+        for page_size in self.page_sizes:
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(expected):
+                    response = client.get(f'/api/recipes/?limit={page_size}')
+                self.assertEqual(len(response.data['results']), page_size)
+
+    def test_anonymous_list_queries(self):
+        self.assert_list_queries(APIClient(), self.anonymous_queries)
+
+    def test_authenticated_list_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assert_list_queries(client, self.authenticated_queries)
+        recipy = client.get('/api/recipes/?limit=1').data['results'][0]
+        self.assertTrue(recipy['is_favorited'])
+        self.assertTrue(recipy['is_in_shopping_cart'])
+        self.assertTrue(recipy['author']['is_subscribed'])
+        self.assertEqual(len(recipy['tags']), 2)
+        self.assertEqual(len(recipy['ingredients']), 3)
+
+
+class SubscriptionsTest(MediaTestCase):
+    """
+    Список подписок: пустой для нового пользователя, у каждого автора
+    не больше recipes_limit последних рецептов, а число запросов
+    не зависит от recipes_limit.
+    """
+    subscriptions_queries = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.newcomer, *authors = (
+            User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='pass'
+            )
+            for name in ('user', 'newcomer', 'author1', 'author2')
+        )
+        cls.latest = {}
+        for author in authors:
+            Follow.objects.create(user=cls.user, author=author)
+            for number in range(4):
+                cls.latest[author.id] = Recipy.objects.create(
+                    author=author,
+                    name=f'Рецепт {number}',
+                    text='Текст',
+                    cooking_time=5,
+                    image=cls.create_image()
+                )
+
+    def get_subscriptions(self, user, query=''):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/api/users/subscriptions/{query}')
+
+    def test_no_subscriptions(self):
+        response = self.get_subscriptions(self.newcomer)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['results'], [])
+
+    def test_recipes_limit(self):
+        for query, expected in (
+            ('', 3),
+            ('?recipes_limit=1', 1),
+            ('?recipes_limit=10', 4),
+            ('?recipes_limit=abc', 3),
+            ('?recipes_limit=²', 3),
+        ):
+            with self.subTest(query=query):
+                response = self.get_subscriptions(self.user, query)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), 2)
+                for author in response.data['results']:
+                    self.assertEqual(author['recipes_count'], 4)
+                    self.assertEqual(len(author['recipes']), expected)
+                    self.assertEqual(
+                        author['recipes'][0]['id'],
+                        self.latest[author['id']].id
+                    )
+
+    def test_subscriptions_queries(self):
+        self.get_subscriptions(self.user, '?recipes_limit=4')
+        for recipes_limit in (1, 4):
+            with self.subTest(recipes_limit=recipes_limit):
+                with self.assertNumQueries(self.subscriptions_queries):
+                    self.get_subscriptions(
+                        self.user, f'?recipes_limit={recipes_limit}'
+                    )
@@ -1,21 +1,39 @@
-from django.http import FileResponse
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import (
+    FileResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from core.pagination import CustomPagination
-from core.viewsets import CreateDestroyViewSet
+from core.pagination import (
+    CustomPagination,
+    FeedPagination,
+    KeysetPagination
+)
+from core.viewsets import CachedListMixin, CreateDestroyViewSet
 from recipes.models import (
+    Dosage,
     Favorite,
     Ingredient,
     Recipy,
     ShoppingCart,
     Tag
 )
-from .filters import IngredientFilter, RecipyFilter
+from users.models import Follow
+from .filters import IngredientFilter, RecipyFilter, RecipyOrderingFilter
+from .ingredient_index import ingredient_index
+from .parsers import RecipyJSONParser, RecipyMultiPartParser
 from .permissions import IsAuthorOrReadOnly
+from .renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
 from .serializers import (
     FavoriteSerializer,
     IngredientSerializer,
@@ -24,7 +42,14 @@ from .serializers import (
     ShoppingCartSerializer,
     TagSerializer
 )
-from .service import create_content, create_downloadable_file
+from .service import (
+    create_content,
+    get_content_version,
+    get_downloadable_file,
+    get_shopping_list,
+    stream_csv,
+    stream_text
+)
 
 
 class RecipyViewSet(viewsets.ModelViewSet):
@@ -38,32 +63,140 @@ class RecipyViewSet(viewsets.ModelViewSet):
     """
     queryset = Recipy.objects.select_related('author').all()
     permission_classes = (IsAuthorOrReadOnly,)
-    pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, ]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, RecipyOrderingFilter]
     filterset_class = RecipyFilter
+    parser_classes = (RecipyJSONParser, RecipyMultiPartParser)
+    ordering_fields = ('pub_date', 'favorites_count', 'in_carts_count')
     serializer_class = RecipyGetSerializer
 
+    read_actions = ('list', 'retrieve', 'popular', 'feed')
+
     def get_serializer_class(self):
         """Выбирает необходимый сериалайзер для действия."""
-        if self.action == 'list' or self.action == 'retrieve':
+        if self.action in self.read_actions:
             return RecipyGetSerializer
         return RecipySerializer
 
-    @action(detail=False, url_path='download_shopping_cart')
+    def get_serializer_context(self):
+        """Списки рецептов отдают изображения размера карточки."""
+        context = super().get_serializer_context()
+        if self.action in ('list', 'popular', 'feed'):
+            context['image_size'] = 'card'
+        return context
+
+    def get_queryset(self):
+        """
+        Аннотирует рецепты флагами is_favorited и is_in_shopping_cart
+        для текущего пользователя, чтобы не делать запрос на каждый рецепт.
+        Для просмотра заранее подгружает теги и ингредиенты с дозировкой.
+        """
+        queryset = Recipy.objects.select_related('author')
+        if self.action in self.read_actions:
+            queryset = queryset.prefetch_related(
+                'tags',
+                Prefetch(
+                    'recipyingredient',
+                    queryset=Dosage.objects.select_related('ingredient')
+                )
+            )
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_favorited=Exists(Favorite.objects.filter(
+                    user=user, recipy=OuterRef('pk')
+                )),
+                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user=user, recipy=OuterRef('pk')
+                ))
+            )
+        return queryset
+
+    @action(detail=False, url_path='popular')
+    def popular(self, request):
+        """
+        Выводит популярные за неделю рецепты по заранее рассчитанному
+        рейтингу, страница строится по индексу без агрегации избранного.
+        """
+        queryset = self.get_queryset().filter(
+            popularity__isnull=False
+        ).order_by('-popularity__score', '-pk')
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        url_path='feed',
+        permission_classes=(permissions.IsAuthenticated,)
+    )
+    def feed(self, request):
+        """
+        Выводит рецепты авторов, на которых подписан пользователь,
+        от новых к старым. Лента строится одним запросом с EXISTS
+        по подпискам и листается по ключу (pub_date, id).
+        """
+        queryset = self.get_queryset().filter(Exists(Follow.objects.filter(
+            user=request.user, author=OuterRef('author')
+        )))
+        paginator = FeedPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        url_path='download_shopping_cart',
+        renderer_classes=(
+            PDFRenderer,
+            JSONRenderer,
+            CSVRenderer,
+            PlainTextRenderer
+        )
+    )
     def download_shopping_cart(self, request):
         """
-        Формирует скачиваемый pdf файл со списком ингредентов и дозировкой
+        Формирует скачиваемый файл со списком ингредентов и дозировкой
         для выбранных в "список покупок" рецептов.
+        Формат выбирается параметром format: pdf (по умолчанию),
+        json, csv или txt. Все форматы строятся по одному запросу.
+        Если список не изменился с прошлого скачивания, отвечает 304.
         """
-        user = request.user
-        content = create_content(user)
-        buffer = create_downloadable_file(content)
-        return FileResponse(
-            buffer, as_attachment=True, filename='shopping_cart.pdf'
-        )
+        ingredients = get_shopping_list(request.user)
+        content = create_content(ingredients)
+        version = get_content_version(content)
+        file_format = request.accepted_renderer.format
+        etag = f'"{version}-{file_format}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif file_format == 'json':
+            response = Response(ingredients)
+        elif file_format == 'pdf':
+            response = FileResponse(
+                get_downloadable_file(ingredients, version),
+                as_attachment=True,
+                filename='shopping_cart.pdf'
+            )
+        else:
+            stream = (
+                stream_csv(ingredients) if file_format == 'csv'
+                else stream_text(content)
+            )
+            response = StreamingHttpResponse(
+                stream,
+                content_type=f'{request.accepted_renderer.media_type}; '
+                             f'charset={request.accepted_renderer.charset}'
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="shopping_cart.{file_format}"'
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для отображения списка и единично тегов."""
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
@@ -71,7 +204,7 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.AllowAny,)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для отображения спика и единично ингредиентов."""
     queryset = Ingredient.objects.all()
     pagination_class = None
@@ -80,6 +213,18 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_class = IngredientFilter
     permission_classes = (permissions.AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        """
+        При включённом INGREDIENT_INDEX_ENABLED поиск по названию
+        выполняется по индексу в памяти, без запроса к базе данных.
+        """
+        name = request.query_params.get('name')
+        if name and settings.INGREDIENT_INDEX_ENABLED:
+            return Response(ingredient_index.search(
+                name, settings.INGREDIENT_SEARCH_LIMIT
+            ))
+        return super().list(request, *args, **kwargs)
+
 
 class CreateDesroyFavViewSet(CreateDestroyViewSet):
     """
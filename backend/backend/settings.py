@@ -109,6 +109,65 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+INGREDIENT_SEARCH_LIMIT = 20
+
+# Поиск ингредиентов по индексу в памяти процесса. Версия справочника
+# хранится в кэше versions, общем для всех процессов.
+INGREDIENT_INDEX_ENABLED = False
+
+PDF_FONT_PATH = os.path.join(BASE_DIR, 'fonts', 'arial.ttf')
+
+# Ограничения на изображение рецепта, проверяются до его декодирования:
+# размер файла в байтах и наибольшая сторона в пикселях.
+RECIPE_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+
+RECIPE_IMAGE_MAX_DIMENSION = 5000
+
+# Размеры уменьшенных копий изображений рецептов: вдвое больше,
+# чем на страницах фронтенда, для экранов высокой плотности.
+RECIPE_IMAGE_SIZES = {
+    'card': '726x480',
+    'detail': '960x960',
+    'subscription': '144x144',
+}
+
+THUMBNAIL_FORMAT = 'WEBP'
+
+THUMBNAIL_UPSCALE = False
+
+# В default кроме готовых списков тегов и ингредиентов живёт хранилище
+# sorl.thumbnail, по записи на каждую копию изображения. Метки версий
+# лежат отдельно, чтобы очистка default при переполнении их не удаляла.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', default='/tmp/foodgram_cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'VERSION_CACHE_LOCATION', default='/tmp/foodgram_versions'
+        ),
+        'TIMEOUT': None,
+    },
+    'shopping_cart': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shopping_cart',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100,
+        },
+    },
+}
+
+# В кэш shopping_cart попадают только pdf не больше этого размера, так что
+# он занимает не более 100 * 128 КБ = 12,5 МБ памяти в каждом процессе.
+# Обычный список покупок весит 45-55 КБ, в основном это шрифт.
+SHOPPING_CART_CACHE_MAX_FILE_SIZE = 128 * 1024
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -121,8 +180,13 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CustomPagination',
 }
 
+# Начиная с этого числа строк неотфильтрованные списки показывают
+# оценку количества из статистики PostgreSQL. None — всегда точно.
+APPROXIMATE_COUNT_THRESHOLD = 10000
+
 DJOSER = {
     'HIDE_USERS': False,
     'LOGIN_FIELD': 'email',
@@ -0,0 +1,24 @@
+"""
+Метки версий наборов данных в общем для процессов кэше versions.
+Метка меняется при каждом изменении модели, по ней процессы
+понимают, что их локальные копии данных устарели.
+"""
+import time
+
+from django.core.cache import caches
+
+
+def get_version_key(model):
+    return f'version_{model._meta.label_lower}'
+
+
+def get_version(model):
+    """Возвращает метку версии модели, создавая её при отсутствии."""
+    return caches['versions'].get_or_set(
+        get_version_key(model), time.time, None
+    )
+
+
+def bump_version(model):
+    """Обновляет метку версии модели после её изменения."""
+    caches['versions'].set(get_version_key(model), time.time(), None)
@@ -1,23 +1,85 @@
 # flake8: noqa: I001, I004
 import csv
+import json
+import os
+import time
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from core.cache import bump_version
 from recipes.models import Ingredient
 
+BATCH_SIZE = 1000
+
 
 class Command(BaseCommand):
-    """Заполняет базу данных данными из файла ingredients.csv"""
-    help = 'Заполняет базу данных из файла ingredients.csv'
+    """
+    Заполняет базу данных данными из файла ingredients.csv
+    или ingredients.json. Дубликаты отбрасываются в памяти,
+    запись идёт пачками в одной транзакции.
+    """
+    help = 'Заполняет базу данных из файла ingredients.csv или .json'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv'),
+            help='Путь к файлу csv или json с ингредиентами.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одном запросе на вставку.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Прочитать файл без записи в базу данных.'
+        )
+
+    def read_file(self, path):
+        """Возвращает пары название — единица измерения из файла."""
+        with open(path, encoding='utf-8') as file:
+            if path.endswith('.json'):
+                return [
+                    (row['name'], row['measurement_unit'])
+                    for row in json.load(file)
+                ]
+            return [(row[0], row[1]) for row in csv.reader(file) if row]
 
     def handle(self, *args, **options):
-        with open(
-            f'{settings.BASE_DIR}/data/ingredients.csv', encoding='utf-8'
-        ) as file:
-            reader = csv.reader(file)
-            for ingredient in reader:
-                Ingredient.objects.get_or_create(
-                    name=ingredient[0],
-                    measurement_unit=ingredient[1]
-                )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        start = time.monotonic()
+        try:
+            rows = self.read_file(options['file'])
+        except (OSError, ValueError, KeyError, IndexError) as error:
+            raise CommandError(f'Не удалось прочитать файл: {error}')
+        unique_rows = dict.fromkeys(rows)
+        ingredients = [
+            Ingredient(name=name, measurement_unit=measurement_unit)
+            for name, measurement_unit in unique_rows
+        ]
+        if options['dry_run']:
+            self.stdout.write(
+                f'Прочитано строк: {len(rows)}, '
+                f'уникальных ингредиентов: {len(ingredients)}.'
+            )
+            return
+        with transaction.atomic():
+            count_before = Ingredient.objects.count()
+            Ingredient.objects.bulk_create(
+                ingredients,
+                batch_size=options['batch_size'],
+                ignore_conflicts=True
+            )
+            created = Ingredient.objects.count() - count_before
+        bump_version(Ingredient)
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено ингредиентов: {created} из {len(ingredients)} '
+            f'за {elapsed:.2f} с ({len(ingredients) / elapsed:.0f} строк/с).'
+        ))
@@ -0,0 +1,34 @@
+# flake8: noqa: I001, I004
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipy, ShoppingCart
+
+
+def count_for_recipy(model):
+    """Подзапрос с количеством строк модели для каждого рецепта."""
+    return Coalesce(Subquery(
+        model.objects.filter(
+            recipy=OuterRef('pk')
+        ).order_by().values('recipy').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает счётчики добавлений рецептов
+    в избранное и в списки покупок.
+    """
+    help = 'Пересчитывает favorites_count и in_carts_count у рецептов'
+
+    def handle(self, *args, **options):
+        updated = Recipy.objects.update(
+            favorites_count=count_for_recipy(Favorite),
+            in_carts_count=count_for_recipy(ShoppingCart)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны счётчики у рецептов: {updated}.'
+        ))
@@ -0,0 +1,47 @@
+# flake8: noqa: I001, I004
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from recipes.models import Favorite, PopularRecipy, ShoppingCart
+
+PERIOD = timedelta(days=7)
+HALF_LIFE = timedelta(days=2)
+WEIGHTS = {
+    Favorite: 1.0,
+    ShoppingCart: 0.5,
+}
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает рейтинг популярных рецептов за последнюю неделю.
+    Каждое добавление в избранное или в покупки даёт вклад с весом
+    из WEIGHTS, который уменьшается вдвое каждые HALF_LIFE.
+    Запускается периодически, например из cron.
+    """
+    help = 'Пересчитывает рейтинг популярных рецептов за неделю'
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        scores = defaultdict(float)
+        for model, weight in WEIGHTS.items():
+            rows = model.objects.filter(
+                created__gte=now - PERIOD
+            ).values_list('recipy_id', 'created')
+            for recipy_id, created in rows.iterator():
+                scores[recipy_id] += weight * 0.5 ** (
+                    (now - created) / HALF_LIFE
+                )
+        with transaction.atomic():
+            PopularRecipy.objects.all().delete()
+            PopularRecipy.objects.bulk_create(
+                PopularRecipy(recipy_id=recipy_id, score=score)
+                for recipy_id, score in scores.items()
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рассчитан рейтинг рецептов: {len(scores)}.'
+        ))
@@ -1,10 +1,190 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class EstimatedPage(Page):
+    """Страница, для которой наличие следующей известно по лишней строке."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = has_next
+
+    def has_next(self):
+        return self.next_exists
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для неотфильтрованной выборки из большой таблицы
+    берёт количество строк из статистики планировщика PostgreSQL
+    вместо COUNT(*). Порог задаётся APPROXIMATE_COUNT_THRESHOLD.
+    Оценка не ограничивает номера страниц: страница читается с одной
+    лишней строкой, по которой и определяется, есть ли следующая.
+    """
+    count_is_exact = True
+
+    def get_estimate(self):
+        queryset = self.object_list
+        threshold = settings.APPROXIMATE_COUNT_THRESHOLD
+        connection = connections[queryset.db]
+        if (
+            threshold is None
+            or connection.vendor != 'postgresql'
+            or queryset.query.where
+            or queryset.query.distinct
+        ):
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < threshold:
+            return None
+        return row[0]
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = self.get_estimate()
+            if estimate is not None:
+                self.count_is_exact = False
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        self.count
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return EstimatedPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
 
 
 class CustomPagination(PageNumberPagination):
     """
     Класс кастомной пагинации.
     Используется в api и users.
+    Поле count_exact показывает, точное ли количество в count.
     """
     page_size = 6
     page_size_query_param = 'limit'
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_exact'] = self.page.paginator.count_is_exact
+        return response
+
+
+class KeysetPagination(CustomPagination):
+    """
+    Пагинация рецептов. По умолчанию работает как CustomPagination,
+    а с параметром cursor листает по ключу (pub_date, id) от новых
+    к старым, без OFFSET и без подсчёта общего количества.
+    Пустой cursor запрашивает первую страницу.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    date_field = 'pub_date'
+    cursor_only = False
+    cursor = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            not self.cursor_only
+            and self.cursor_query_param not in request.query_params
+        ):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f'-{self.date_field}', '-pk')
+        position = self.decode_cursor(request)
+        if position is not None:
+            date, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.date_field}__lt': date})
+                | Q(**{self.date_field: date, 'pk__lt': pk})
+            )
+        page = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            last = page[-1]
+            self.next_position = (getattr(last, self.date_field), last.pk)
+        return page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            date, pk = base64.urlsafe_b64decode(
+                encoded.encode()
+            ).decode().split('|')
+            date, pk = parse_datetime(date), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return date, pk
+
+    def get_next_link(self):
+        if not self.cursor:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        date, pk = self.next_position
+        encoded = base64.urlsafe_b64encode(
+            f'{date.isoformat()}|{pk}'.encode()
+        ).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        if not self.cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+
+class FeedPagination(KeysetPagination):
+    """Пагинация ленты подписок, всегда листает по ключу (pub_date, id)."""
+    cursor_only = True
@@ -1,28 +1,100 @@
 import base64
+import binascii
+import io
 
+from django.conf import settings
 from django.core.files.base import ContentFile
+from django.core.files.images import get_image_dimensions
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
+from sorl.thumbnail import get_thumbnail
 
 from recipes.models import Recipy
 
+# Столько символов base64 раскодируется, чтобы прочитать размеры
+# изображения из заголовка, кратно четырём.
+IMAGE_HEADER_CHARS = 64 * 1024
+
 
 class Base64ImageField(serializers.ImageField):
-    """Сериализирует изображение формата base64."""
+    """
+    Сериализирует изображение формата base64 или загруженное файлом.
+    Размер и стороны изображения проверяются до его декодирования.
+    """
+    default_error_messages = {
+        'max_image_size': 'Размер изображения больше {max_size} байт.',
+        'max_dimension': 'Сторона изображения больше {max_dimension} пикселей.'
+    }
+
+    def check_size(self, size):
+        if size > settings.RECIPE_IMAGE_MAX_SIZE:
+            self.fail(
+                'max_image_size', max_size=settings.RECIPE_IMAGE_MAX_SIZE
+            )
+
+    def check_dimensions(self, width, height):
+        """Неизвестные стороны не пропускаются как нулевые."""
+        if width is None or height is None:
+            self.fail('invalid_image')
+        if max(width, height) > settings.RECIPE_IMAGE_MAX_DIMENSION:
+            self.fail(
+                'max_dimension',
+                max_dimension=settings.RECIPE_IMAGE_MAX_DIMENSION
+            )
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            try:
+                self.check_size(len(imgstr) * 3 // 4 - imgstr[-2:].count('='))
+                dimensions = get_image_dimensions(io.BytesIO(
+                    base64.b64decode(imgstr[:IMAGE_HEADER_CHARS])
+                ))
+                if dimensions[0] is not None:
+                    self.check_dimensions(*dimensions)
+                data = ContentFile(
+                    base64.b64decode(imgstr), name='temp.' + ext
+                )
+            except binascii.Error:
+                self.fail('invalid_image')
+            if dimensions[0] is None:
+                # Стороны записаны дальше заголовка, например после
+                # большого блока EXIF: читаем их из всего файла.
+                self.check_dimensions(*get_image_dimensions(data))
+        elif isinstance(data, UploadedFile):
+            self.check_size(data.size)
+            self.check_dimensions(*get_image_dimensions(data))
 
         return super().to_internal_value(data)
 
 
-class LimitedListSerializer(serializers.ListSerializer):
-    """Ограничение до 3 шт в выдаче списком."""
+class ThumbnailImageField(serializers.ImageField):
+    """
+    Отдаёт ссылку на уменьшенную копию изображения вместо оригинала.
+    Копию создаёт sorl.thumbnail при первом обращении и хранит в media.
+    Размер из RECIPE_IMAGE_SIZES берётся из контекста сериализатора
+    по ключу image_size или из аргумента size.
+    """
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
 
-    def to_representation(self, data):
-        data = data.all()[:3]
-        return super(LimitedListSerializer, self).to_representation(data)
+    def to_representation(self, value):
+        if not value:
+            return None
+        size = self.context.get('image_size', self.size)
+        thumbnail = get_thumbnail(
+            value,
+            settings.RECIPE_IMAGE_SIZES[size],
+            crop='center'
+        )
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(thumbnail.url)
+        return thumbnail.url
 
 
 class RecipesShort(serializers.ModelSerializer):
@@ -32,9 +104,8 @@ class RecipesShort(serializers.ModelSerializer):
     Вынесен в приложение core для избежания кругового импорта,
     который вызывает ошибки.
     """
-    image = Base64ImageField(read_only=True)
+    image = ThumbnailImageField(size='subscription')
 
     class Meta:
         fields = ('id', 'name', 'image', 'cooking_time')
-        list_serializer_class = LimitedListSerializer
         model = Recipy
@@ -0,0 +1,103 @@
+import base64
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.pagination import CustomPagination, EstimatedCountPaginator
+from core.serializer_recipy import Base64ImageField
+from recipes.models import Recipy
+from users.models import User
+
+
+class EstimatedCountPaginationTest(TestCase):
+    """Оценка количества строк не ограничивает доступ к страницам."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        Recipy.objects.bulk_create([
+            Recipy(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Текст',
+                cooking_time=5,
+                image='recipes/test.png'
+            )
+            for number in range(9)
+        ])
+
+    def paginate(self, page):
+        request = Request(
+            APIRequestFactory().get('/', {'page': page, 'limit': 3})
+        )
+        paginator = CustomPagination()
+        rows = paginator.paginate_queryset(
+            Recipy.objects.order_by('-id'), request
+        )
+        return paginator, rows
+
+    @mock.patch.object(EstimatedCountPaginator, 'get_estimate', lambda _: 6)
+    def test_pages_past_underestimate_are_reachable(self):
+        paginator, rows = self.paginate(2)
+        self.assertEqual(len(rows), 3)
+        self.assertIsNotNone(paginator.get_next_link())
+        paginator, rows = self.paginate(3)
+        self.assertEqual(len(rows), 3)
+        self.assertIsNone(paginator.get_next_link())
+        self.assertFalse(paginator.page.paginator.count_is_exact)
+        with self.assertRaises(NotFound):
+            self.paginate(4)
+
+    @mock.patch.object(EstimatedCountPaginator, 'get_estimate', lambda _: 30)
+    def test_overestimate_ends_at_last_row(self):
+        paginator, rows = self.paginate(3)
+        self.assertEqual(len(rows), 3)
+        self.assertIsNone(paginator.get_next_link())
+        with self.assertRaises(NotFound):
+            self.paginate(5)
+
+    def test_exact_count_without_estimate(self):
+        paginator, rows = self.paginate(3)
+        self.assertTrue(paginator.page.paginator.count_is_exact)
+        self.assertEqual(paginator.page.paginator.count, 9)
+        self.assertIsNone(paginator.get_next_link())
+
+
+class Base64ImageFieldTest(TestCase):
+    """Ограничение сторон работает и при размерах далеко от начала файла."""
+
+    def create_jpeg(self, size, exif_size):
+        image = io.BytesIO()
+        Image.new('RGB', size, 'red').save(
+            image, 'JPEG', exif=b'Exif\x00\x00' + b'\x00' * exif_size
+        )
+        return image.getvalue()
+
+    def test_dimension_limit_behind_large_exif(self):
+        content = self.create_jpeg((6000, 100), 60000)
+        for data in (
+            'data:image/jpeg;base64,' + base64.b64encode(content).decode(),
+            SimpleUploadedFile('image.jpg', content, 'image/jpeg'),
+        ):
+            with self.subTest(data=type(data).__name__):
+                with self.assertRaises(serializers.ValidationError) as error:
+                    Base64ImageField().run_validation(data)
+                self.assertEqual(
+                    error.exception.detail[0].code, 'max_dimension'
+                )
+
+    def test_small_image_behind_large_exif(self):
+        content = self.create_jpeg((400, 300), 60000)
+        image = Base64ImageField().run_validation(
+            'data:image/jpeg;base64,' + base64.b64encode(content).decode()
+        )
+        self.assertEqual(image.image.size, (400, 300))
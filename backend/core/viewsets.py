@@ -1,4 +1,11 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from rest_framework import mixins, viewsets
+from rest_framework.renderers import JSONRenderer
+
+from .cache import get_version, get_version_key
 
 
 class CreateDestroyViewSet(
@@ -12,3 +19,37 @@ class CreateDestroyViewSet(
     и избранного в приложении api.
     """
     pass
+
+
+class CachedListMixin:
+    """
+    Отдаёт полный список объектов с ETag и Last-Modified,
+    а готовый json хранит в кэше до следующего изменения модели.
+    Для тегов и ингредиентов в приложении api.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        model = self.get_queryset().model
+        version = get_version(model)
+        etag = f'"{model._meta.model_name}-{version}"'
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(version)
+        )
+        if response is None:
+            key = f'{get_version_key(model)}_list_{version}'
+            content = cache.get(key)
+            if content is None:
+                serializer = self.get_serializer(
+                    self.get_queryset(), many=True
+                )
+                content = JSONRenderer().render(serializer.data)
+                cache.set(key, content)
+            response = HttpResponse(
+                content, content_type='application/json'
+            )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(version)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
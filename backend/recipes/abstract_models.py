@@ -20,6 +20,11 @@ class RecipyToUserModel(models.Model):
         related_query_name="%(app_label)s_%(class)ss",
         on_delete=models.CASCADE
     )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name="дата добавления"
+    )
 
     class Meta:
         abstract = True
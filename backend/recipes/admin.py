@@ -4,6 +4,7 @@ from .models import (
     Dosage,
     Favorite,
     Ingredient,
+    PopularRecipy,
     Recipy,
     RecipyTags,
     ShoppingCart,
@@ -37,21 +38,30 @@ class IngredientInline(admin.StackedInline):
 class RecipyAdmin(admin.ModelAdmin):
     """Класс для отображения рецептов в админ зоне."""
     model = Recipy
-    list_display = ('name', 'author', 'text', 'cooking_time', 'fav_count')
+    list_display = (
+        'name',
+        'author',
+        'text',
+        'cooking_time',
+        'favorites_count',
+        'in_carts_count'
+    )
     list_filter = ('name', 'author__username', 'tags__name')
+    readonly_fields = ('favorites_count', 'in_carts_count')
     inlines = [
         TagInline,
         IngredientInline
     ]
 
-    def fav_count(self, obj):
-        return Favorite.objects.filter(recipy=obj).count()
-    fav_count.short_description = 'Количество добавлений в избранное'
-
 
 class RecipyToUserAdmin(admin.ModelAdmin):
     """Класс для отображения списков покупок и избранного в админ зоне."""
-    list_display = ('user', 'recipy')
+    list_display = ('user', 'recipy', 'created')
+
+
+class PopularRecipyAdmin(admin.ModelAdmin):
+    """Класс для отображения рейтинга популярных рецептов в админ зоне."""
+    list_display = ('recipy', 'score')
 
 
 admin.site.register(Tag, TagAdmin)
@@ -59,3 +69,4 @@ admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Recipy, RecipyAdmin)
 admin.site.register(ShoppingCart, RecipyToUserAdmin)
 admin.site.register(Favorite, RecipyToUserAdmin)
+admin.site.register(PopularRecipy, PopularRecipyAdmin)
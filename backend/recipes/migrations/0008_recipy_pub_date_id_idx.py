@@ -0,0 +1,17 @@
+# Generated by Django 3.2.19 on 2026-10-18 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_ingredient_name_upper_pattern_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipy',
+            index=models.Index(fields=['-pub_date', '-id'], name='recipy_pub_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.19 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipy_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dosage',
+            index=models.Index(fields=['recipy', 'ingredient'], name='dosage_recipy_ingredient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipy',
+            index=models.Index(fields=['author', '-pub_date'], name='recipy_author_pub_date_idx'),
+        ),
+    ]
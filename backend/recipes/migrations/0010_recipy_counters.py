@@ -0,0 +1,45 @@
+# Generated by Django 3.2.19 on 2026-10-18 17:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Recipy = apps.get_model('recipes', 'Recipy')
+
+    def count_for_recipy(model_name):
+        model = apps.get_model('recipes', model_name)
+        return Coalesce(Subquery(
+            model.objects.filter(
+                recipy=OuterRef('pk')
+            ).order_by().values('recipy').annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0)
+
+    Recipy.objects.update(
+        favorites_count=count_for_recipy('Favorite'),
+        in_carts_count=count_for_recipy('ShoppingCart')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipy',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в избранное'),
+        ),
+        migrations.AddField(
+            model_name='recipy',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в список покупок'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
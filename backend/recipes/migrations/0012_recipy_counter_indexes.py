@@ -0,0 +1,21 @@
+# Generated by Django 3.2.19 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_popular_recipes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipy',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipy_favorites_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipy',
+            index=models.Index(fields=['-in_carts_count', '-id'], name='recipy_in_carts_count_id_idx'),
+        ),
+    ]
@@ -123,11 +123,38 @@ class Recipy(models.Model):
         ]
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    favorites_count: int = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество добавлений в избранное'
+    )
+    in_carts_count: int = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество добавлений в список покупок'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='recipy_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='recipy_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipy_favorites_count_id_idx'
+            ),
+            models.Index(
+                fields=['-in_carts_count', '-id'],
+                name='recipy_in_carts_count_id_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name
@@ -184,6 +211,12 @@ class Dosage(models.Model):
         ordering = ('ingredient',)
         verbose_name = 'Ингредиент рецепта'
         verbose_name_plural = 'Ингредиенты рецепта'
+        indexes = [
+            models.Index(
+                fields=['recipy', 'ingredient'],
+                name='dosage_recipy_ingredient_idx'
+            )
+        ]
 
     def __str__(self):
         return (
@@ -222,3 +255,29 @@ class Favorite(RecipyToUserModel):
 
     def __str___(self):
         return f'{self.user} добавил в избранное рецепт {self.recipy}'
+
+
+class PopularRecipy(models.Model):
+    """
+    Класс для представления рейтинга популярных рецептов.
+    Пересчитывается командой update_popular.
+    """
+    recipy = models.OneToOneField(
+        Recipy,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        verbose_name='Рецепт'
+    )
+    score: float = models.FloatField(
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
+
+    class Meta:
+        ordering = ('-score',)
+        verbose_name = 'Популярный рецепт'
+        verbose_name_plural = 'Популярные рецепты'
+
+    def __str__(self):
+        return f'{self.recipy} — {self.score:.2f}'
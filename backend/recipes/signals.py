@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_version
+from .models import Favorite, Ingredient, Recipy, ShoppingCart, Tag
+
+COUNTER_FIELDS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver((post_save, post_delete), sender=Tag)
+def catalogue_changed(sender, **kwargs):
+    """
+    Обновляет версию справочника после фиксации транзакции, иначе
+    запрос между обновлением метки и фиксацией сохранит под новой
+    версией старые данные.
+    """
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+def change_counter(sender, instance, delta):
+    field = COUNTER_FIELDS[sender]
+    Recipy.objects.filter(pk=instance.recipy_id).update(
+        **{field: F(field) + delta}
+    )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def recipy_added(sender, instance, created, **kwargs):
+    """Увеличивает счётчик рецепта при добавлении в избранное или покупки."""
+    if created:
+        change_counter(sender, instance, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def recipy_removed(sender, instance, **kwargs):
+    """Уменьшает счётчик рецепта при удалении из избранного или покупок."""
+    change_counter(sender, instance, -1)
@@ -0,0 +1,137 @@
+import re
+
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Sum
+from django.test import TestCase
+
+from users.models import Follow, User
+from .models import Dosage, Favorite, Ingredient, Recipy, ShoppingCart
+
+
+class HotPathIndexesTest(TestCase):
+    """
+    Запросы списков из api не читают таблицы целиком. Данные засеяны
+    так, чтобы на каждого пользователя приходилась малая доля строк
+    избранного, покупок, подписок и рецептов.
+    """
+    users_count = 200
+    per_user = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(
+                username=f'user{number}',
+                email=f'user{number}@example.com',
+                password='pass'
+            )
+            for number in range(cls.users_count)
+        ])
+        users = list(User.objects.order_by('id'))
+        cls.user = users[0]
+        Ingredient.objects.bulk_create([
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(2000)
+        ])
+        ingredients = list(Ingredient.objects.order_by('id'))
+        Recipy.objects.bulk_create([
+            Recipy(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Текст',
+                cooking_time=5,
+                image='recipes/test.png'
+            )
+            for author in users
+            for number in range(cls.per_user)
+        ])
+        cls.recipes = list(Recipy.objects.order_by('id'))
+        Dosage.objects.bulk_create([
+            Dosage(
+                recipy=recipy,
+                ingredient=ingredients[(recipy.id * 7 + shift) % 2000],
+                amount=10
+            )
+            for recipy in cls.recipes
+            for shift in range(3)
+        ])
+        for model in (Favorite, ShoppingCart):
+            model.objects.bulk_create([
+                model(
+                    user=user,
+                    recipy=cls.recipes[(number * 37 + shift) % 1000]
+                )
+                for number, user in enumerate(users)
+                for shift in range(cls.per_user)
+            ])
+        Follow.objects.bulk_create([
+            Follow(user=user, author=users[(number + shift) % len(users)])
+            for number, user in enumerate(users)
+            for shift in range(1, cls.per_user + 1)
+        ])
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def get_full_scans(self, queryset):
+        """Возвращает строки плана с полным просмотром таблицы."""
+        plan = queryset.explain().splitlines()
+        if connection.vendor == 'postgresql':
+            return [line for line in plan if 'Seq Scan' in line]
+        scans = [line for line in plan if re.search(r'\bSCAN ', line)]
+        # Проход SQLite в порядке ORDER BY без сортировки останавливается
+        # на LIMIT, поэтому первая таблица с таким проходом не полная.
+        if (
+            queryset.query.order_by
+            and queryset.query.high_mark is not None
+            and not any('ORDER BY' in line for line in plan)
+        ):
+            return scans[1:]
+        return scans
+
+    def test_endpoint_queries_use_indexes(self):
+        user = self.user
+        author = self.recipes[0].author
+        querysets = {
+            'recipes': Recipy.objects.select_related(
+                'author'
+            ).order_by('-pub_date', '-id')[:6],
+            'author recipes': Recipy.objects.filter(
+                author=author
+            ).order_by('-pub_date', '-id')[:6],
+            'favorites_count ordering': Recipy.objects.order_by(
+                '-favorites_count', '-id'
+            )[:6],
+            'in_carts_count ordering': Recipy.objects.order_by(
+                '-in_carts_count', '-id'
+            )[:6],
+            'is_favorited filter': Recipy.objects.filter(Exists(
+                Favorite.objects.filter(user=user, recipy=OuterRef('pk'))
+            )).order_by('-pub_date', '-id')[:6],
+            'dosage prefetch': Dosage.objects.select_related(
+                'ingredient'
+            ).filter(recipy__in=[recipy.id for recipy in self.recipes[:6]]),
+            'favorites': Favorite.objects.filter(
+                user=user
+            ).select_related('recipy'),
+            'shopping cart': ShoppingCart.objects.filter(
+                user=user
+            ).select_related('recipy'),
+            'shopping list': Dosage.objects.filter(
+                recipy__recipes_shoppingcarts__user=user
+            ).values(name=F('ingredient__name')).annotate(
+                total=Sum('amount')
+            ).order_by('name'),
+            'follows': Follow.objects.filter(
+                user=user
+            ).select_related('author'),
+            'subscriptions': User.objects.filter(
+                follower__user=user
+            ).order_by('-id')[:6],
+            'users': User.objects.order_by('-id')[:6],
+        }
+        for name, queryset in querysets.items():
+            with self.subTest(query=name):
+                self.assertEqual(self.get_full_scans(queryset), [])
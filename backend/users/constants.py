@@ -6,3 +6,4 @@ CHARS_FOR_ROLE = 5
 CHARS_FOR_USERNAME = 150
 CHARS_FOR_FIRST_NAME = 150
 CHARS_FOR_LAST_NAME = 150
+RECIPES_LIMIT = 3
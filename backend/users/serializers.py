@@ -12,7 +12,8 @@ from .constants import (
     CHARS_FOR_FIRST_NAME,
     CHARS_FOR_LAST_NAME,
     CHARS_FOR_PASSWORD,
-    CHARS_FOR_USERNAME
+    CHARS_FOR_USERNAME,
+    RECIPES_LIMIT
 )
 from .models import Follow, User
 
@@ -105,17 +106,39 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        """
+        Проверяет подписку по множеству id авторов текущего пользователя.
+        Множество загружается одним запросом и хранится в контексте,
+        общем для всех вложенных сериализаторов одного ответа.
+        """
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
-        if request is None:
+        if request is None or not request.user.is_authenticated:
             return False
-        return request.user.is_authenticated and Follow.objects.filter(
-            user=request.user, author=obj
-        ).exists()
+        if 'following' not in self.context:
+            self.context['following'] = set(
+                request.user.following.values_list('author_id', flat=True)
+            )
+        return obj.id in self.context['following']
+
+
+def get_recipes_limit(request):
+    """Возвращает количество рецептов автора из параметра recipes_limit."""
+    if request is not None:
+        value = request.query_params.get('recipes_limit', '')
+        if value.isdecimal():
+            return int(value)
+    return RECIPES_LIMIT
 
 
 class UserRecipesSerializer(CustomUserSerializer):
-    """Сериализатор для отображения пользователя со списком его рецептов."""
-    recipes = RecipesShort(read_only=True, many=True)
+    """
+    Сериализатор для отображения пользователя со списком его рецептов.
+    Использует заранее подгруженные limited_recipes и recipes_count,
+    если они есть у объекта.
+    """
+    recipes = serializers.SerializerMethodField()
     recipes_count = serializers.SerializerMethodField()
 
     class Meta:
@@ -131,7 +154,16 @@ class UserRecipesSerializer(CustomUserSerializer):
             'recipes_count'
         )
 
+    def get_recipes(self, obj):
+        recipes = getattr(obj, 'limited_recipes', None)
+        if recipes is None:
+            limit = get_recipes_limit(self.context.get('request'))
+            recipes = obj.recipes.all()[:limit]
+        return RecipesShort(recipes, many=True, context=self.context).data
+
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
         return obj.recipes.count()
 
 
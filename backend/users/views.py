@@ -1,11 +1,21 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, Value
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 
 from core.pagination import CustomPagination
 from core.viewsets import CreateDestroyViewSet
+from recipes.models import Recipy
 from .models import Follow, User
-from .serializers import FollowSerializer, UserRecipesSerializer
+from .serializers import (
+    FollowSerializer,
+    UserRecipesSerializer,
+    get_recipes_limit
+)
 
 
 class FollowViewSet(generics.ListAPIView):
@@ -16,7 +26,41 @@ class FollowViewSet(generics.ListAPIView):
 
     def get_queryset(self):
         current_user = self.request.user
-        return User.objects.filter(follower__user=current_user)
+        return User.objects.filter(
+            follower__user=current_user
+        ).annotate(
+            recipes_count=Count('recipes'),
+            is_subscribed=Value(True)
+        ).order_by('-id')
+
+    def paginate_queryset(self, queryset):
+        """
+        Подгружает последние recipes_limit рецептов всех авторов страницы
+        одним запросом с ROW_NUMBER() OVER (PARTITION BY author_id).
+        """
+        authors = super().paginate_queryset(queryset)
+        if not authors:
+            return authors
+        ranked = Recipy.objects.filter(
+            author__in=authors
+        ).annotate(
+            row_num=Window(
+                RowNumber(),
+                partition_by=F('author_id'),
+                order_by=(F('pub_date').desc(), F('id').desc())
+            )
+        ).order_by().values('id', 'row_num')
+        sql, params = ranked.query.sql_with_params()
+        recipes = Recipy.objects.filter(pk__in=RawSQL(
+            f'SELECT id FROM ({sql}) ranked WHERE row_num <= %s',
+            (*params, get_recipes_limit(self.request))
+        )).order_by('-pub_date', '-id')
+        by_author = defaultdict(list)
+        for recipy in recipes:
+            by_author[recipy.author_id].append(recipy)
+        for author in authors:
+            author.limited_recipes = by_author[author.id]
+        return authors
 
 
 class CreateDesroyFollowViewSet(CreateDestroyViewSet):
@@ -32,7 +76,9 @@ class CreateDesroyFollowViewSet(CreateDestroyViewSet):
         user = request.user
         author = get_object_or_404(User, id=id)
         Follow.objects.create(user=user, author=author)
-        return Response(UserRecipesSerializer(author).data)
+        return Response(UserRecipesSerializer(
+            author, context={'request': request}
+        ).data)
 
     def destroy(self, request, id):
         author = get_object_or_404(User, id=id)